@@ -7,10 +7,41 @@ import os
 import sys
 import json
 import ctypes
+import fnmatch
 from datetime import timedelta
 
+def get_process_age():
+    """Return seconds since this process was created, or 0.0 if the OS cannot tell"""
+    try:
+        if os.name == "nt":
+            kernel32 = ctypes.windll.kernel32
+            creation, exit_time, kernel_time, user_time, now = (ctypes.c_ulonglong() for _ in range(5))
+            if not kernel32.GetProcessTimes(ctypes.c_void_p(kernel32.GetCurrentProcess()), ctypes.byref(creation),
+                                            ctypes.byref(exit_time), ctypes.byref(kernel_time),
+                                            ctypes.byref(user_time)):
+                return 0.0
+            kernel32.GetSystemTimePreciseAsFileTime(ctypes.byref(now))
+            # FILETIME counts 100 ns intervals
+            return max(0.0, (now.value - creation.value) / 1e7)
+        
+        with open("/proc/self/stat", 'r', encoding='utf-8') as f:
+            # The command name may contain spaces, so count fields after its closing parenthesis
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime", 'r', encoding='utf-8') as f:
+            uptime = float(f.read().split()[0])
+        return max(0.0, uptime - start_ticks / os.sysconf("SC_CLK_TCK"))
+    except (OSError, ValueError, IndexError, AttributeError):
+        return 0.0
+
+# Reference point for the startup profile: when the process was created, so the
+# interpreter start and imports are included
+STARTUP_TIME = time.perf_counter() - get_process_age()
+
 # Configuration
 CONFIG_FILE = "config_for_shutdown_timer.json"
+DRAIN_LOG_FILE = "shutdown_timer_drain.log"
+# Seconds the drain report stays on screen before the forced shutdown
+DRAIN_REPORT_SECONDS = 5
 DEFAULT_CONFIG = {
     "font_family": "Arial",
     "font_size": 12,
@@ -20,14 +51,679 @@ DEFAULT_CONFIG = {
     "auto_size": True,
     "overlay_position": (0, 0),
     "overlay_size": (400, 200),
-    "last_timer": {"days": 0, "hours": 0, "minutes": 0, "seconds": 0}
+    "last_timer": {"days": 0, "hours": 0, "minutes": 0, "seconds": 0},
+    "drain_enabled": False,
+    "drain_patterns": ["notepad*", "winword*", "excel*", "code*", "blender*"],
+    "drain_owner": "",
+    "drain_timeout": 30,
+    "trigger_mode": "countdown",
+    "watch_targets": "",
+    "watch_grace": 0,
+    "overlay_out_of_process": False
+}
+
+# Out-of-process overlay connection
+OVERLAY_ENDPOINT_FILE = "overlay.json"
+OVERLAY_MAX_MESSAGE = 64 * 1024
+# Seconds the overlay process waits for the main window to (re)connect before exiting
+OVERLAY_ORPHAN_TIMEOUT = 60
+
+# Startup budgets checked by --profile-startup (see README, Performance)
+FIRST_FRAME_BUDGET_MS = 1000
+RSS_BUDGET_MB = 30
+# Build deferred windows anyway if the main window has not been exposed by then
+STARTUP_FALLBACK_MS = 2000
+
+def iter_processes(owner=""):
+    """Yield (pid, name, cmdline) for running processes in a single pass.
+
+    An empty owner means the current user and "*" means any user. On Windows
+    tasklist does not expose command lines, so cmdline is the image name there.
+    """
+    if not owner:
+        import getpass
+        owner = getpass.getuser()
+    owner = owner.lower()
+    own_pid = os.getpid()
+
+    if os.name == "nt":
+        import subprocess
+        # Single tasklist pass; the verbose format includes the owning user
+        try:
+            output = subprocess.run(["tasklist", "/v", "/fo", "csv", "/nh"], capture_output=True, text=True,
+                                    creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0)).stdout
+        except Exception as e:
+            print(f"Error listing processes: {e}")
+            return
+        for line in output.splitlines():
+            fields = [f.strip('"') for f in line.split('","')]
+            if len(fields) < 7 or not fields[1].isdigit():
+                continue
+            name, pid, user = fields[0], int(fields[1]), fields[6].lower()
+            if pid == own_pid:
+                continue
+            if owner != "*" and user.split("\\")[-1] != owner.split("\\")[-1]:
+                continue
+            yield pid, name, name
+        return
+
+    if not os.path.isdir("/proc"):
+        return
+
+    import pwd
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit() or int(entry) == own_pid:
+            continue
+        try:
+            if owner != "*":
+                uid = os.stat(f"/proc/{entry}").st_uid
+                if pwd.getpwuid(uid).pw_name.lower() != owner:
+                    continue
+            with open(f"/proc/{entry}/comm", 'r', encoding='utf-8', errors='replace') as f:
+                name = f.read().strip()
+            with open(f"/proc/{entry}/cmdline", 'rb') as f:
+                cmdline = f.read().replace(b"\0", b" ").decode('utf-8', 'replace').strip()
+        except (OSError, KeyError):
+            # Process exited while scanning or is not accessible
+            continue
+        yield int(entry), name, cmdline
+
+def process_matches(pattern, name, cmdline):
+    """Case-insensitive wildcard match against a process name or command line"""
+    pattern = pattern.strip().lower()
+    return fnmatch.fnmatch(name.lower(), pattern) or fnmatch.fnmatch(cmdline.lower(), pattern)
+
+def list_processes(patterns, owner=""):
+    """Enumerate running processes whose name or command line matches any pattern.
+
+    Patterns are case-insensitive shell-style wildcards matched against either the
+    process name or its full command line. On Windows only the image name is
+    matched (see iter_processes). Returns a list of (pid, name) tuples.
+    """
+    patterns = [p for p in patterns if p.strip()]
+    if not patterns:
+        return []
+    return [(pid, name) for pid, name, cmdline in iter_processes(owner)
+            if any(process_matches(p, name, cmdline) for p in patterns)]
+
+def terminate_processes(pids):
+    """Politely ask all given processes to close at once (SIGTERM / WM_CLOSE)"""
+    if not pids:
+        return
+    if os.name == "nt":
+        import subprocess
+        # taskkill without /f posts a close request, letting applications prompt to save
+        args = ["taskkill"]
+        for pid in pids:
+            args += ["/pid", str(pid)]
+        try:
+            subprocess.run(args, capture_output=True, creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0))
+        except Exception as e:
+            print(f"Error terminating processes: {e}")
+        return
+    import signal
+    for pid in pids:
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except OSError:
+            pass
+
+class Waker:
+    """Wakes a blocking wait_for_exit from another thread, e.g. when the user cancels.
+
+    Backed by a pipe on Linux and a manual-reset event on Windows, so the wait can
+    block on it together with the processes instead of polling a flag.
+    """
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.closed = False
+        self.is_set = False
+        if os.name == "nt":
+            self.kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+            self.kernel32.CreateEventW.restype = ctypes.c_void_p
+            self.handle = self.kernel32.CreateEventW(None, True, False, None)
+        else:
+            self.read_fd, self.write_fd = os.pipe()
+    
+    def set(self):
+        """Wake the wait; later calls and calls after close() do nothing"""
+        with self.lock:
+            if self.closed or self.is_set:
+                return
+            self.is_set = True
+            if os.name == "nt":
+                self.kernel32.SetEvent(ctypes.c_void_p(self.handle))
+            else:
+                os.write(self.write_fd, b"\0")
+    
+    def close(self):
+        """Release the pipe or event once the wait is over"""
+        with self.lock:
+            if self.closed:
+                return
+            self.closed = True
+            if os.name == "nt":
+                self.kernel32.CloseHandle(ctypes.c_void_p(self.handle))
+            else:
+                os.close(self.read_fd)
+                os.close(self.write_fd)
+
+def wait_for_exit(pids, timeout=None, waker=None, on_exit=None, terminate=False):
+    """Wait on several processes together until all exit, the timeout elapses or waker is set.
+
+    Uses pidfd on Linux and process handles on Windows so the wait blocks in the
+    kernel, without a timeout unless one is given. With terminate=True the processes
+    are asked to close once they are held open, so a recycled PID is never signalled.
+    on_exit(pid) is called as each process ends. Returns the set of pids that exited.
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    exited = set()
+
+    def mark_exited(pid):
+        exited.add(pid)
+        if on_exit:
+            on_exit(pid)
+
+    def time_left():
+        # None blocks until something happens
+        if deadline is None:
+            return None
+        return deadline - time.monotonic()
+
+    if os.name == "nt":
+        import queue
+        SYNCHRONIZE = 0x00100000
+        PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+        STILL_ACTIVE = 259
+        WAIT_OBJECT_0 = 0x0
+        INFINITE = 0xFFFFFFFF
+        ERROR_INVALID_PARAMETER = 87
+        # WaitForMultipleObjects takes 64 handles; two slots per batch are the stop and wake events
+        BATCH_SIZE = 62
+        kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+        kernel32.OpenProcess.restype = ctypes.c_void_p
+        kernel32.CreateEventW.restype = ctypes.c_void_p
+        
+        def is_alive(pid):
+            # Used when the process cannot be waited on, e.g. elevated processes
+            handle = kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+            if not handle:
+                return ctypes.get_last_error() != ERROR_INVALID_PARAMETER
+            exit_code = ctypes.c_ulong()
+            kernel32.GetExitCodeProcess(ctypes.c_void_p(handle), ctypes.byref(exit_code))
+            kernel32.CloseHandle(ctypes.c_void_p(handle))
+            return exit_code.value == STILL_ACTIVE
+        
+        handles = {}
+        fallback = set()
+        for pid in pids:
+            handle = kernel32.OpenProcess(SYNCHRONIZE, False, pid)
+            if handle:
+                handles[handle] = pid
+            elif ctypes.get_last_error() == ERROR_INVALID_PARAMETER:
+                # No such process
+                mark_exited(pid)
+            else:
+                fallback.add(pid)
+        
+        if terminate:
+            # The open handles keep these PIDs from being reused until we are done
+            terminate_processes(list(handles.values()) + list(fallback))
+        
+        results = queue.Queue()
+        stop_event = kernel32.CreateEventW(None, True, False, None)
+        
+        events = [stop_event] + ([waker.handle] if waker else [])
+        
+        def wait_batch(batch):
+            # Block until a process in this batch exits, or the stop or wake event is set
+            while batch:
+                array = (ctypes.c_void_p * (len(batch) + len(events)))(*batch, *events)
+                result = kernel32.WaitForMultipleObjects(len(batch) + len(events), array, False, INFINITE)
+                if WAIT_OBJECT_0 <= result < WAIT_OBJECT_0 + len(batch):
+                    results.put(("exited", [batch.pop(result - WAIT_OBJECT_0)]))
+                elif result == WAIT_OBJECT_0 + len(batch):
+                    break
+                elif result == WAIT_OBJECT_0 + len(batch) + 1:
+                    results.put(("woken", []))
+                    break
+                else:
+                    results.put(("failed", batch))
+                    break
+        
+        # Every batch is waited on at once, so exits past the first 64 are seen right away
+        all_handles = list(handles)
+        waiters = [threading.Thread(target=wait_batch, args=(all_handles[i:i + BATCH_SIZE],), daemon=True)
+                   for i in range(0, len(all_handles), BATCH_SIZE)]
+        for waiter in waiters:
+            waiter.start()
+        
+        pending = set(handles)
+        try:
+            while pending or fallback:
+                if waker and waker.is_set:
+                    break
+                remaining = time_left()
+                if remaining is not None and remaining <= 0:
+                    break
+                if fallback:
+                    # Processes without a waitable handle have to be polled
+                    remaining = 0.5 if remaining is None else min(remaining, 0.5)
+                    for pid in list(fallback):
+                        if not is_alive(pid):
+                            fallback.discard(pid)
+                            mark_exited(pid)
+                try:
+                    kind, batch = results.get(timeout=remaining)
+                except queue.Empty:
+                    continue
+                if kind == "woken":
+                    break
+                for handle in batch:
+                    pending.discard(handle)
+                    if kind == "exited":
+                        mark_exited(handles[handle])
+                    else:
+                        # The wait itself failed; keep track of these by polling
+                        fallback.add(handles[handle])
+        finally:
+            kernel32.SetEvent(ctypes.c_void_p(stop_event))
+            for waiter in waiters:
+                waiter.join()
+            for handle in handles:
+                kernel32.CloseHandle(ctypes.c_void_p(handle))
+            kernel32.CloseHandle(ctypes.c_void_p(stop_event))
+        return exited
+
+    import select
+    import signal
+    pidfds = {}
+    fallback = set()
+    for pid in pids:
+        try:
+            pidfds[os.pidfd_open(pid)] = pid
+        except ProcessLookupError:
+            mark_exited(pid)
+        except (AttributeError, OSError):
+            # Kernel or Python without pidfd support
+            fallback.add(pid)
+
+    if terminate:
+        # Signal through the pidfd so a recycled PID is never hit
+        for fd in pidfds:
+            try:
+                signal.pidfd_send_signal(fd, signal.SIGTERM)
+            except OSError:
+                pass
+        terminate_processes(list(fallback))
+
+    poller = select.poll()
+    for fd in pidfds:
+        poller.register(fd, select.POLLIN)
+    if waker:
+        poller.register(waker.read_fd, select.POLLIN)
+    try:
+        while pidfds or fallback:
+            if waker and waker.is_set:
+                break
+            remaining = time_left()
+            if remaining is not None and remaining <= 0:
+                break
+            if fallback:
+                # Processes without pidfd support have to be polled
+                remaining = 0.2 if remaining is None else min(remaining, 0.2)
+            events = poller.poll(None if remaining is None else remaining * 1000)
+            if waker and any(fd == waker.read_fd for fd, _ in events):
+                break
+            for fd, _ in events:
+                poller.unregister(fd)
+                os.close(fd)
+                mark_exited(pidfds.pop(fd))
+            for pid in list(fallback):
+                try:
+                    os.kill(pid, 0)
+                except ProcessLookupError:
+                    fallback.discard(pid)
+                    mark_exited(pid)
+                except OSError:
+                    pass
+    finally:
+        for fd in pidfds:
+            os.close(fd)
+    return exited
+
+def parse_seconds(text, default):
+    """Parse a whole, non-negative number of seconds from an entry field, or return default"""
+    try:
+        value = int(text.strip())
+    except ValueError:
+        return default
+    return value if value >= 0 else default
+
+def format_time(seconds):
+    """Format time in appropriate format based on remaining seconds (without leading zeros)"""
+    delta = timedelta(seconds=seconds)
+    total_seconds = int(delta.total_seconds())
+    
+    if total_seconds >= 86400:
+        days = total_seconds // 86400
+        hours = (total_seconds % 86400) // 3600
+        minutes = (total_seconds % 3600) // 60
+        secs = total_seconds % 60
+        return f"{days}:{hours:02d}:{minutes:02d}:{secs:02d}"
+    elif total_seconds >= 3600:
+        hours = total_seconds // 3600
+        minutes = (total_seconds % 3600) // 60
+        secs = total_seconds % 60
+        return f"{hours}:{minutes:02d}:{secs:02d}"
+    elif total_seconds >= 60:
+        minutes = total_seconds // 60
+        secs = total_seconds % 60
+        return f"{minutes}:{secs:02d}"
+    else:
+        return f"{total_seconds} sec"
+
+def get_private_dir():
+    """User-private directory holding the overlay endpoint and socket"""
+    if os.name == "nt":
+        # Per-user profile directory; its default ACL only grants access to the user
+        path = os.path.join(os.environ.get("LOCALAPPDATA") or os.path.expanduser("~"), "ShutdownTimer")
+        os.makedirs(path, exist_ok=True)
+        return path
+    
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir and os.path.isdir(runtime_dir) and os.stat(runtime_dir).st_uid == os.getuid():
+        base = runtime_dir
+    else:
+        import tempfile
+        base = tempfile.gettempdir()
+    path = os.path.join(base, f"shutdown-timer-{os.getuid()}")
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+    
+    # Refuse a directory someone else created or can write to
+    import stat
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise PermissionError(f"Insecure overlay directory: {path}")
+    return path
+
+def new_overlay_endpoint():
+    """Create a fresh address and random authkey for this session and store them privately"""
+    import secrets
+    if os.name == "nt":
+        address = rf"\\.\pipe\ShutdownTimerOverlay-{secrets.token_hex(16)}"
+    else:
+        address = os.path.join(get_private_dir(), "overlay.sock")
+    endpoint = {"address": address, "authkey": secrets.token_hex(32)}
+    
+    path = os.path.join(get_private_dir(), OVERLAY_ENDPOINT_FILE)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(endpoint, f)
+    return endpoint
+
+def read_overlay_endpoint():
+    """Return (address, authkey) of the current session, or None if there is none"""
+    try:
+        with open(os.path.join(get_private_dir(), OVERLAY_ENDPOINT_FILE), 'r', encoding='utf-8') as f:
+            endpoint = json.load(f)
+        return endpoint["address"], bytes.fromhex(endpoint["authkey"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+def is_number(value):
+    """True for ints and floats, but not bools"""
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+def is_point(value):
+    """True for an [x, y] pair of ints"""
+    return (isinstance(value, list) and len(value) == 2 and
+            all(isinstance(n, int) and not isinstance(n, bool) for n in value))
+
+# Accepted keys and value checks for overlay messages in each direction
+OVERLAY_STATE_CHECKS = {
+    "text": lambda v: isinstance(v, str) and len(v) <= 200,
+    "deadline": lambda v: v is None or is_number(v),
+    "font_family": lambda v: isinstance(v, str) and len(v) <= 100,
+    "font_size": lambda v: isinstance(v, int) and not isinstance(v, bool) and 1 <= v <= 500,
+    "text_color": lambda v: isinstance(v, str) and len(v) <= 50,
+    "bg_color": lambda v: isinstance(v, str) and len(v) <= 50,
+    "opacity": lambda v: is_number(v) and 0 <= v <= 1,
+    "auto_size": lambda v: isinstance(v, bool),
+    "size": is_point,
+    "position": is_point,
+    "visible": lambda v: isinstance(v, bool),
+    "quit": lambda v: isinstance(v, bool)
+}
+OVERLAY_REPLY_CHECKS = {
+    "position": is_point
 }
 
+def send_overlay_message(connection, message):
+    """Send a message as JSON (never pickle) over an overlay connection"""
+    connection.send_bytes(json.dumps(message).encode('utf-8'))
+
+def recv_overlay_message(connection, checks):
+    """Receive a JSON message and keep only known keys with valid values"""
+    try:
+        message = json.loads(connection.recv_bytes(OVERLAY_MAX_MESSAGE).decode('utf-8'))
+    except (ValueError, UnicodeDecodeError):
+        return {}
+    if not isinstance(message, dict):
+        return {}
+    return {key: value for key, value in message.items() if key in checks and checks[key](value)}
+
+class PrivatePipeListener:
+    """Windows named-pipe listener whose pipe only the owning user can open.
+
+    Mirrors multiprocessing's pipe listener, but creates each pipe instance with a
+    DACL granting access to the owner only, and refuses to join a pipe someone else
+    created first.
+    """
+    
+    def __init__(self, address, authkey):
+        self.address = address
+        self.authkey = authkey
+        self.first_instance = True
+        
+        advapi32 = ctypes.WinDLL("advapi32", use_last_error=True)
+        self.descriptor = ctypes.c_void_p()
+        # Protected DACL with a single ACE: generic all for the owner
+        if not advapi32.ConvertStringSecurityDescriptorToSecurityDescriptorW(
+                "D:P(A;;GA;;;OW)", 1, ctypes.byref(self.descriptor), None):
+            raise ctypes.WinError(ctypes.get_last_error())
+        
+        class SECURITY_ATTRIBUTES(ctypes.Structure):
+            _fields_ = [("nLength", ctypes.c_ulong), ("lpSecurityDescriptor", ctypes.c_void_p),
+                        ("bInheritHandle", ctypes.c_int)]
+        
+        self.attributes = SECURITY_ATTRIBUTES(ctypes.sizeof(SECURITY_ATTRIBUTES), self.descriptor, 0)
+        self.kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+        self.kernel32.CreateNamedPipeW.restype = ctypes.c_void_p
+        
+        # Create the first instance now so a squatted name fails immediately
+        self.pending = self.create_instance()
+    
+    def create_instance(self):
+        """Create one pipe instance protected by the owner-only DACL"""
+        PIPE_ACCESS_DUPLEX = 0x3
+        FILE_FLAG_OVERLAPPED = 0x40000000
+        FILE_FLAG_FIRST_PIPE_INSTANCE = 0x00080000
+        PIPE_TYPE_MESSAGE = 0x4
+        PIPE_READMODE_MESSAGE = 0x2
+        PIPE_UNLIMITED_INSTANCES = 255
+        BUFSIZE = 8192
+        
+        open_mode = PIPE_ACCESS_DUPLEX | FILE_FLAG_OVERLAPPED
+        if self.first_instance:
+            open_mode |= FILE_FLAG_FIRST_PIPE_INSTANCE
+        handle = self.kernel32.CreateNamedPipeW(self.address, open_mode, PIPE_TYPE_MESSAGE | PIPE_READMODE_MESSAGE,
+                                                PIPE_UNLIMITED_INSTANCES, BUFSIZE, BUFSIZE, 0,
+                                                ctypes.byref(self.attributes))
+        if handle is None or handle == ctypes.c_void_p(-1).value:
+            raise ctypes.WinError(ctypes.get_last_error())
+        self.first_instance = False
+        return handle
+    
+    def accept(self):
+        """Wait for a client and complete mutual authentication, like Listener.accept()"""
+        import _winapi
+        from multiprocessing import AuthenticationError
+        from multiprocessing.connection import PipeConnection, deliver_challenge, answer_challenge
+        
+        handle, self.pending = self.pending, self.create_instance()
+        try:
+            overlapped = _winapi.ConnectNamedPipe(handle, overlapped=True)
+        except OSError as e:
+            if e.winerror != _winapi.ERROR_NO_DATA:
+                raise
+        else:
+            try:
+                _winapi.WaitForMultipleObjects([overlapped.event], False, _winapi.INFINITE)
+            except:
+                overlapped.cancel()
+                _winapi.CloseHandle(handle)
+                raise
+            finally:
+                overlapped.GetOverlappedResult(True)
+        
+        connection = PipeConnection(handle)
+        try:
+            deliver_challenge(connection, self.authkey)
+            answer_challenge(connection, self.authkey)
+        except (AuthenticationError, OSError, EOFError):
+            connection.close()
+            raise
+        return connection
+    
+    def close(self):
+        """Release the pending pipe instance and the security descriptor"""
+        import _winapi
+        _winapi.CloseHandle(self.pending)
+        ctypes.windll.kernel32.LocalFree(self.descriptor)
+
+def launch_overlay_process():
+    """Start the overlay renderer as a separate, detached process"""
+    if getattr(sys, 'frozen', False):
+        args = [sys.executable, "--overlay"]
+    else:
+        args = [sys.executable, os.path.abspath(__file__), "--overlay"]
+    import subprocess
+    subprocess.Popen(args, start_new_session=True, creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0))
+
+class OverlayClient:
+    """Main-process side of the out-of-process overlay.
+
+    Only values that differ from what the overlay last received are sent. A lost
+    connection is re-established (relaunching the overlay with a new endpoint and
+    key if needed) on the next update, and everything is resent after reconnecting.
+    Relaunches back off and stop after MAX_LAUNCHES attempts without a connection,
+    after which failed is set.
+    """
+    
+    RELAUNCH_INTERVAL = 5
+    MAX_LAUNCHES = 3
+    
+    def __init__(self):
+        self.connection = None
+        self.sent = {}
+        self.position = None
+        self.launched_at = None
+        self.launches = 0
+        self.failed = False
+    
+    def connect(self):
+        """Connect to a running overlay, launching one if none answers"""
+        from multiprocessing import AuthenticationError
+        from multiprocessing.connection import Client
+        endpoint = read_overlay_endpoint()
+        if endpoint is not None:
+            try:
+                self.connection = Client(endpoint[0], authkey=endpoint[1])
+                self.sent = {}
+                self.launches = 0
+                return True
+            except (OSError, EOFError, AuthenticationError):
+                self.connection = None
+        
+        # Give a freshly launched overlay time to start listening, doubling the wait after each launch
+        if self.launched_at is not None:
+            if time.monotonic() - self.launched_at <= self.RELAUNCH_INTERVAL * 2 ** (self.launches - 1):
+                return False
+        if self.launches >= self.MAX_LAUNCHES:
+            self.failed = True
+            return False
+        
+        self.launched_at = time.monotonic()
+        self.launches += 1
+        try:
+            new_overlay_endpoint()
+            launch_overlay_process()
+        except Exception as e:
+            print(f"Error launching overlay: {e}")
+        return False
+    
+    def update(self, state):
+        """Send the values of state that changed since the last update"""
+        if self.connection is None and not self.connect():
+            return
+        
+        changes = {key: value for key, value in state.items() if key not in self.sent or self.sent[key] != value}
+        if not changes:
+            return
+        try:
+            send_overlay_message(self.connection, changes)
+            self.sent.update(changes)
+            self.receive()
+        except (OSError, EOFError):
+            self.connection = None
+    
+    def receive(self):
+        """Collect messages from the overlay, such as its position after a drag"""
+        while self.connection is not None and self.connection.poll():
+            message = recv_overlay_message(self.connection, OVERLAY_REPLY_CHECKS)
+            if "position" in message:
+                # The overlay already has this position; don't echo it back
+                self.position = message["position"]
+                self.sent["position"] = self.position
+    
+    def close(self):
+        """Ask the overlay to exit and drop the connection"""
+        if self.connection is None:
+            return
+        try:
+            self.receive()
+            send_overlay_message(self.connection, {"quit": True})
+            self.connection.close()
+        except (OSError, EOFError):
+            pass
+        self.connection = None
+
+def drain_applications(patterns, owner="", timeout=30, waker=None):
+    """Ask matching applications to close and wait for them together.
+
+    Returns (closed, remaining, elapsed) where closed and remaining are lists of
+    (pid, name) tuples and elapsed is the drain duration in seconds. The wait ends
+    early when waker is set.
+    """
+    start = time.monotonic()
+    targets = list_processes(patterns, owner)
+    names = dict(targets)
+    exited = wait_for_exit(list(names), timeout=timeout, waker=waker, terminate=True)
+    closed = [(pid, names[pid]) for pid in names if pid in exited]
+    remaining = [(pid, names[pid]) for pid in names if pid not in exited]
+    return closed, remaining, time.monotonic() - start
+
 class ShutdownTimerApp:
     def __init__(self, root):
         self.root = root
         self.root.title("Shutdown Timer")
-        self.root.geometry("600x400")
+        # Let the window fit its contents; the settings panel is taller than 400px
+        self.root.minsize(600, 400)
         self.root.resizable(True, True)
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
         
@@ -39,7 +735,18 @@ class ShutdownTimerApp:
         self.start_time = 0
         self.pause_time = 0
         self.shutdown_scheduled = False
+        self.is_watching = False
+        self.is_draining = False
+        self.watch_waker = None
+        self.drain_waker = None
+        self.watched = {}
         self.overlay = None
+        self.overlay_client = None
+        self.deadline = None
+        self.opacity_window = None
+        self.font_window = None
+        self.first_frame_time = None
+        self.ready_time = None
         
         # Load configuration
         self.config = self.load_config()
@@ -48,16 +755,49 @@ class ShutdownTimerApp:
         # Create main UI
         self.create_main_window()
         
-        # Create overlay window
-        self.create_overlay()
-        
         # Restore last timer values
         self.restore_last_timer()
+        
+        # Build the overlay once the main window has been painted
+        self.root.bind("<Expose>", self.on_first_expose)
+        # Fallback in case the main window is never exposed (e.g. started minimized)
+        self.root.after(STARTUP_FALLBACK_MS, self.finish_startup)
+    
+    def on_first_expose(self, event):
+        """Defer the first-frame stamp until the exposed window has been drawn"""
+        # Widgets of the main window share the root's bindings, so this is the first one exposed
+        self.root.unbind("<Expose>")
+        self.root.after_idle(self.mark_first_frame)
+    
+    def mark_first_frame(self):
+        """Record the first frame, then run the remaining startup work"""
+        if self.first_frame_time is not None:
+            return
+        # Widget redraws are idle handlers queued by the expose events; flush them so the stamp covers them
+        self.root.update_idletasks()
+        self.first_frame_time = time.perf_counter()
+        self.root.after_idle(self.finish_startup)
+    
+    def finish_startup(self):
+        """Build deferred windows after the main window's first frame"""
+        if self.ready_time is not None:
+            return
+        
+        self.ensure_overlay()
+        if self.config["overlay_out_of_process"]:
+            self.start_overlay_process()
+        self.ready_time = time.perf_counter()
+    
+    def ensure_overlay(self):
+        """Create the overlay window if it has not been built yet"""
+        if self.overlay is None:
+            self.create_overlay()
     
     def load_config(self):
         """Load configuration from file if enabled or use defaults"""
         try:
-            if hasattr(self, 'save_config_var') and self.save_config_var.get() and os.path.exists(CONFIG_FILE):
+            # The file is only written when saving is enabled, so its presence means it was enabled
+            if os.path.exists(CONFIG_FILE):
                 with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
                     config = json.load(f)
                     # Merge with defaults to handle missing keys
@@ -133,6 +873,27 @@ class ShutdownTimerApp:
         second_entry.grid(row=0, column=7, padx=5, pady=5)
         second_entry.bind("<KeyRelease>", lambda e: self.validate_input(e, self.second_var))
         
+        # Trigger mode: countdown or shut down when watched processes exit
+        trigger_frame = ttk.Frame(main_frame)
+        trigger_frame.pack(fill=tk.X)
+        
+        self.trigger_mode_var = tk.StringVar(value=self.config.get("trigger_mode", "countdown"))
+        ttk.Radiobutton(trigger_frame, text="Countdown", variable=self.trigger_mode_var, value="countdown",
+                        command=self.toggle_trigger_mode).grid(row=0, column=0, padx=5, pady=5, sticky=tk.W)
+        ttk.Radiobutton(trigger_frame, text="When processes exit:", variable=self.trigger_mode_var, value="process",
+                        command=self.toggle_trigger_mode).grid(row=0, column=1, padx=5, pady=5, sticky=tk.W)
+        
+        self.watch_targets_var = tk.StringVar(value=self.config.get("watch_targets", ""))
+        ttk.Entry(trigger_frame, textvariable=self.watch_targets_var).grid(row=0, column=2, padx=5, pady=5, sticky=tk.EW)
+        
+        ttk.Label(trigger_frame, text="Grace (sec):").grid(row=0, column=3, padx=5, pady=5, sticky=tk.W)
+        self.watch_grace_var = tk.StringVar(value=str(self.config.get("watch_grace", 0)))
+        grace_entry = ttk.Entry(trigger_frame, textvariable=self.watch_grace_var, width=5)
+        grace_entry.grid(row=0, column=4, padx=5, pady=5)
+        grace_entry.bind("<KeyRelease>", lambda e: self.validate_input(e, self.watch_grace_var))
+        
+        trigger_frame.grid_columnconfigure(2, weight=1)
+        
         # Control buttons
         button_frame = ttk.Frame(main_frame)
         button_frame.pack(pady=20, fill=tk.X)
@@ -181,13 +942,45 @@ class ShutdownTimerApp:
                                           variable=self.dynamic_size_var, command=self.toggle_dynamic_size)
         dynamic_size_btn.pack(anchor=tk.W, pady=2)
         
-        self.save_config_var = tk.BooleanVar(value=False)
+        self.save_config_var = tk.BooleanVar(value=os.path.exists(CONFIG_FILE))
         save_config_btn = ttk.Checkbutton(checkboxes_frame, text="Save settings to config_for_shutdown_timer.json", 
                                           variable=self.save_config_var)
         save_config_btn.pack(anchor=tk.W, pady=2)
         
-        # Auto-save current timer values
-        self.save_timer_settings()
+        self.overlay_process_var = tk.BooleanVar(value=self.config.get("overlay_out_of_process", False))
+        overlay_process_btn = ttk.Checkbutton(checkboxes_frame, text="Render overlay in a separate process",
+                                              variable=self.overlay_process_var, command=self.toggle_overlay_process)
+        overlay_process_btn.pack(anchor=tk.W, pady=2)
+        
+        # Graceful application drain before shutdown
+        self.drain_var = tk.BooleanVar(value=self.config.get("drain_enabled", False))
+        drain_btn = ttk.Checkbutton(checkboxes_frame, text="Close applications gracefully before shutdown",
+                                    variable=self.drain_var, command=self.toggle_drain)
+        drain_btn.pack(anchor=tk.W, pady=2)
+        
+        drain_frame = ttk.Frame(checkboxes_frame)
+        drain_frame.pack(fill=tk.X, pady=2)
+        ttk.Label(drain_frame, text="Applications:").pack(side=tk.LEFT, padx=(0, 5))
+        self.drain_patterns_var = tk.StringVar(value=", ".join(self.config["drain_patterns"]))
+        drain_entry = ttk.Entry(drain_frame, textvariable=self.drain_patterns_var)
+        drain_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        drain_entry.bind("<FocusOut>", lambda e: self.save_drain_settings())
+        
+        drain_options_frame = ttk.Frame(checkboxes_frame)
+        drain_options_frame.pack(fill=tk.X, pady=2)
+        ttk.Label(drain_options_frame, text="Owner (blank = you, * = anyone):").pack(side=tk.LEFT, padx=(0, 5))
+        self.drain_owner_var = tk.StringVar(value=self.config["drain_owner"])
+        owner_entry = ttk.Entry(drain_options_frame, textvariable=self.drain_owner_var, width=15)
+        owner_entry.pack(side=tk.LEFT)
+        owner_entry.bind("<FocusOut>", lambda e: self.save_drain_settings())
+        
+        ttk.Label(drain_options_frame, text="Wait (sec):").pack(side=tk.LEFT, padx=(10, 5))
+        self.drain_timeout_var = tk.StringVar(value=str(self.config["drain_timeout"]))
+        timeout_entry = ttk.Entry(drain_options_frame, textvariable=self.drain_timeout_var, width=5)
+        timeout_entry.pack(side=tk.LEFT)
+        timeout_entry.bind("<KeyRelease>", lambda e: self.validate_input(e, self.drain_timeout_var))
+        timeout_entry.bind("<FocusOut>", lambda e: self.save_drain_settings())
+        
     
     def create_overlay(self):
         """Create the floating overlay window with dynamic sizing"""
@@ -234,8 +1027,8 @@ class ShutdownTimerApp:
         # Update colors
         self.update_overlay_colors()
         
-        # Hide initially if configured
-        if not self.show_overlay_var.get():
+        # Hide initially if configured or rendered by the overlay process
+        if not self.show_overlay_var.get() or self.config["overlay_out_of_process"]:
             self.overlay.withdraw()
     
     def start_drag(self, event):
@@ -286,9 +1079,14 @@ class ShutdownTimerApp:
             self.save_timer_settings()
             return
         
-        if not value.isdigit():
-            var.set(value[:-1])
-            return
+        # Drop every non-digit (pasted text, superscripts and other Unicode digits)
+        digits = "".join(c for c in value if c in "0123456789")
+        if digits != value:
+            var.set(digits)
+            value = digits
+            if value == "":
+                self.save_timer_settings()
+                return
         
         if int(value) < 0:
             var.set("")
@@ -326,6 +1124,12 @@ class ShutdownTimerApp:
     
     def start_timer(self):
         """Start the countdown timer"""
+        self.ensure_overlay()
+        
+        if self.trigger_mode_var.get() == "process":
+            self.start_watch()
+            return
+        
         # Calculate total seconds, handling empty fields as 0
         try:
             days = int(self.day_var.get()) if self.day_var.get().strip() else 0
@@ -354,6 +1158,7 @@ class ShutdownTimerApp:
         self.is_paused = False
         self.remaining_time = total_seconds
         self.start_time = time.time()
+        self.deadline = self.start_time + total_seconds
         
         self.countdown_thread = threading.Thread(target=self.countdown_task, daemon=True)
         self.countdown_thread.start()
@@ -363,31 +1168,41 @@ class ShutdownTimerApp:
         self.pause_btn.config(state=tk.NORMAL)
         self.cancel_btn.config(state=tk.NORMAL)
         self.status_var.set(f"Timer started for {self.format_time(total_seconds)}")
+        self.sync_overlay()
         
         # Show overlay if not visible
-        if self.show_overlay_var.get() and self.overlay.winfo_viewable() == 0:
-            self.overlay.deiconify()
+        self.show_overlay_if_hidden()
     
     def pause_timer(self):
         """Pause or resume the countdown"""
+        if self.is_watching:
+            return
+        
         if self.is_paused:
             # Resume timer
             self.is_paused = False
             self.pause_btn.config(text="Pause")
             self.status_var.set("Timer resumed")
             self.start_time = time.time() - (self.pause_time - self.start_time)
+            self.deadline = self.start_time + self.remaining_time
         else:
             # Pause timer
             self.is_paused = True
             self.pause_btn.config(text="Resume")
             self.pause_time = time.time()
             self.status_var.set("Timer paused")
+            self.deadline = None
+        
+        self.sync_overlay()
     
     def cancel_timer(self):
         """Cancel the countdown"""
         if messagebox.askyesno("Confirm Cancel", "Are you sure you want to cancel the timer?"):
             self.is_running = False
             self.is_paused = False
+            self.is_watching = False
+            self.is_draining = False
+            self.wake_waits()
             self.shutdown_scheduled = False
             
             self.start_btn.config(state=tk.NORMAL)
@@ -396,6 +1211,164 @@ class ShutdownTimerApp:
             
             self.status_var.set("Timer canceled")
             self.overlay_time_var.set("00:00:00")
+            self.deadline = None
+            self.sync_overlay()
+    
+    def start_watch(self):
+        """Start watching processes and shut down once all of them have exited"""
+        if self.is_running:
+            messagebox.showwarning("Warning", "A timer is already running")
+            return
+        
+        # Targets are comma-separated PIDs or process name patterns
+        targets = [t.strip() for t in self.watch_targets_var.get().split(",") if t.strip()]
+        if not targets:
+            messagebox.showerror("Error", "Please enter PIDs or process names to watch")
+            return
+        
+        grace_text = self.watch_grace_var.get().strip()
+        grace = parse_seconds(grace_text, None) if grace_text else 0
+        if grace is None:
+            messagebox.showerror("Error", "Please enter a valid grace period in seconds")
+            return
+        self.config["watch_grace"] = grace
+        
+        # Scanning processes can take seconds on Windows; keep it off the UI thread
+        self.start_btn.config(state=tk.DISABLED)
+        self.status_var.set("Looking up processes...")
+        threading.Thread(target=self.resolve_watch_targets, args=(targets,), daemon=True).start()
+    
+    def resolve_watch_targets(self, targets):
+        """Background thread matching all watch targets in a single process scan"""
+        pid_targets = {int(t): t for t in targets if t.isdigit()}
+        patterns = [t for t in targets if not t.isdigit()]
+        watched = {}
+        matched = set()
+        try:
+            for pid, name, cmdline in iter_processes(owner="*"):
+                hits = [p for p in patterns if process_matches(p, name, cmdline)]
+                if pid in pid_targets:
+                    hits.append(pid_targets[pid])
+                if hits:
+                    watched[pid] = name
+                    matched.update(hits)
+        except Exception as e:
+            print(f"Watch lookup error: {e}")
+        unmatched = [t for t in targets if t not in matched]
+        self.root.after(0, self.begin_watch, watched, unmatched)
+    
+    def begin_watch(self, watched, unmatched):
+        """Start the watch once targets are resolved, or report the ones not running"""
+        if unmatched or not watched:
+            self.start_btn.config(state=tk.NORMAL)
+            self.status_var.set("Ready to start timer")
+            messagebox.showerror("Error", "No running process matches: " + ", ".join(unmatched))
+            return
+        
+        if self.is_running:
+            return
+        
+        self.config["watch_targets"] = self.watch_targets_var.get()
+        self.save_config()
+        
+        self.is_running = True
+        self.is_paused = False
+        self.is_watching = True
+        self.watched = watched
+        
+        self.watch_waker = Waker()
+        self.countdown_thread = threading.Thread(target=self.watch_task, args=(list(watched), self.watch_waker),
+                                                 daemon=True)
+        self.countdown_thread.start()
+        
+        # Update UI
+        self.start_btn.config(state=tk.DISABLED)
+        self.pause_btn.config(state=tk.DISABLED)
+        self.cancel_btn.config(state=tk.NORMAL)
+        self.update_watch_display()
+        
+        # Show overlay if not visible
+        self.show_overlay_if_hidden()
+    
+    def watch_task(self, pids, waker):
+        """Background thread blocking until all watched processes have exited or the watch is canceled"""
+        try:
+            exited = wait_for_exit(pids, waker=waker,
+                                   on_exit=lambda pid: self.root.after(0, self.on_watched_exit, pid))
+            if waker.is_set or not self.is_watching:
+                return
+            if set(pids) - exited:
+                self.root.after(0, self.abort_watch, "Error: could not wait on all watched processes")
+            else:
+                self.root.after(0, self.finish_watch)
+        except Exception as e:
+            print(f"Watch error: {e}")
+            self.root.after(0, self.abort_watch, f"Error: {str(e)}")
+        finally:
+            waker.close()
+    
+    def wake_waits(self):
+        """Interrupt a blocking process watch or drain"""
+        for waker in (self.watch_waker, self.drain_waker):
+            if waker is not None:
+                waker.set()
+        self.watch_waker = None
+        self.drain_waker = None
+    
+    def abort_watch(self, message):
+        """Stop a watch that cannot continue and report why"""
+        self.is_running = False
+        self.is_watching = False
+        self.watched = {}
+        
+        self.start_btn.config(state=tk.NORMAL)
+        self.pause_btn.config(state=tk.DISABLED, text="Pause")
+        self.cancel_btn.config(state=tk.DISABLED)
+        
+        self.status_var.set(message)
+        self.overlay_time_var.set("00:00:00")
+        self.sync_overlay()
+    
+    def on_watched_exit(self, pid):
+        """Drop an exited process from the watch list"""
+        self.watched.pop(pid, None)
+        self.update_watch_display()
+    
+    def update_watch_display(self):
+        """Show which watched processes are still alive"""
+        if not self.is_watching:
+            return
+        
+        names = sorted(set(self.watched.values()))
+        shown = ", ".join(names[:3]) + (f" +{len(names) - 3}" if len(names) > 3 else "")
+        self.overlay_time_var.set(f"Waiting: {shown}")
+        self.status_var.set(f"Waiting for {len(self.watched)} process(es) to exit: {', '.join(names)}")
+        
+        if self.config["auto_size"]:
+            self.adjust_overlay_size()
+        
+        self.sync_overlay()
+    
+    def finish_watch(self):
+        """All watched processes exited: run the grace countdown or shut down right away"""
+        if not self.is_watching or self.watched:
+            return
+        
+        self.is_watching = False
+        grace = self.config["watch_grace"]
+        if grace <= 0:
+            self.perform_shutdown()
+            return
+        
+        self.status_var.set(f"All watched processes exited, shutting down in {self.format_time(grace)}")
+        self.remaining_time = grace
+        self.start_time = time.time()
+        self.deadline = self.start_time + grace
+        self.pause_btn.config(state=tk.NORMAL)
+        self.sync_overlay()
+        
+        self.countdown_thread = threading.Thread(target=self.countdown_task, daemon=True)
+        self.countdown_thread.start()
     
     def countdown_task(self):
         """Background thread for countdown"""
@@ -434,26 +1407,7 @@ class ShutdownTimerApp:
     
     def format_time(self, seconds):
         """Format time in appropriate format based on remaining seconds (without leading zeros)"""
-        delta = timedelta(seconds=seconds)
-        total_seconds = int(delta.total_seconds())
-        
-        if total_seconds >= 86400:
-            days = total_seconds // 86400
-            hours = (total_seconds % 86400) // 3600
-            minutes = (total_seconds % 3600) // 60
-            secs = total_seconds % 60
-            return f"{days}:{hours:02d}:{minutes:02d}:{secs:02d}"
-        elif total_seconds >= 3600:
-            hours = total_seconds // 3600
-            minutes = (total_seconds % 3600) // 60
-            secs = total_seconds % 60
-            return f"{hours}:{minutes:02d}:{secs:02d}"
-        elif total_seconds >= 60:
-            minutes = total_seconds // 60
-            secs = total_seconds % 60
-            return f"{minutes}:{secs:02d}"
-        else:
-            return f"{total_seconds} sec"
+        return format_time(seconds)
     
     def show_shutdown_warning(self):
         """Show warning before shutdown"""
@@ -483,19 +1437,114 @@ class ShutdownTimerApp:
         try:
             self.status_var.set("Performing shutdown...")
             self.is_running = False
+            self.deadline = None
+            self.sync_overlay()
             
-            # Flush pending operations
+            # Flush pending operations; a bad drain setting must never block the shutdown
+            try:
+                self.save_drain_settings()
+            except Exception as e:
+                print(f"Error saving drain settings: {e}")
             self.save_config()
             
-            # Perform shutdown
-            os.system("shutdown /s /f /t 0")
+            # Give applications a chance to save and exit before forcing shutdown
+            if self.config["drain_enabled"]:
+                try:
+                    self.is_draining = True
+                    self.cancel_btn.config(state=tk.NORMAL)
+                    self.status_var.set("Closing applications...")
+                    self.drain_waker = Waker()
+                    threading.Thread(target=self.drain_task, args=(self.drain_waker,), daemon=True).start()
+                    return
+                except Exception as e:
+                    print(f"Drain error: {e}")
+                    self.is_draining = False
+            
+            self.execute_shutdown()
             
         except Exception as e:
             print(f"Shutdown error: {e}")
             self.status_var.set(f"Shutdown error: {str(e)}")
     
+    def drain_task(self, waker):
+        """Background thread that closes applications, then hands back to the UI to shut down"""
+        try:
+            closed, remaining, elapsed = drain_applications(self.config["drain_patterns"],
+                                                            self.config["drain_owner"],
+                                                            self.config["drain_timeout"],
+                                                            waker=waker)
+            report = f"Closed {len(closed)} of {len(closed) + len(remaining)} applications in {elapsed:.1f}s"
+            if remaining:
+                report += f"; still running: {', '.join(sorted(set(name for _, name in remaining)))}"
+            self.write_drain_log(closed, remaining, elapsed)
+        except Exception as e:
+            print(f"Drain error: {e}")
+            report = f"Drain error: {str(e)}"
+        finally:
+            waker.close()
+        self.root.after(0, self.finish_drain, report)
+    
+    def write_drain_log(self, closed, remaining, elapsed):
+        """Append the drain result to the log file next to the config"""
+        try:
+            with open(DRAIN_LOG_FILE, 'a', encoding='utf-8') as f:
+                f.write(f"{time.strftime('%Y-%m-%d %H:%M:%S')} drain took {elapsed:.1f}s\n")
+                for pid, name in closed:
+                    f.write(f"  closed: {name} ({pid})\n")
+                for pid, name in remaining:
+                    f.write(f"  still running: {name} ({pid})\n")
+        except Exception as e:
+            print(f"Error writing drain log: {e}")
+    
+    def finish_drain(self, report):
+        """Keep the drain report on screen briefly, then shut down unless canceled"""
+        if not self.is_draining:
+            self.status_var.set(f"{report} (shutdown canceled)")
+            return
+        
+        self.status_var.set(f"{report}. Shutting down in {DRAIN_REPORT_SECONDS} sec...")
+        self.root.after(DRAIN_REPORT_SECONDS * 1000, self.complete_drain)
+    
+    def complete_drain(self):
+        """Issue the shutdown after the report was shown, unless canceled meanwhile"""
+        if self.is_draining:
+            self.is_draining = False
+            self.execute_shutdown()
+    
+    def execute_shutdown(self):
+        """Issue the forced shutdown command"""
+        try:
+            os.system("shutdown /s /f /t 0")
+        except Exception as e:
+            print(f"Shutdown error: {e}")
+            self.status_var.set(f"Shutdown error: {str(e)}")
+    
+    def toggle_trigger_mode(self):
+        """Remember whether Start runs a countdown or watches processes"""
+        self.config["trigger_mode"] = self.trigger_mode_var.get()
+        self.save_config()
+    
+    def toggle_drain(self):
+        """Toggle graceful application drain before shutdown"""
+        self.config["drain_enabled"] = self.drain_var.get()
+        self.save_config()
+    
+    def save_drain_settings(self):
+        """Store the application patterns, owner filter and wait time in config"""
+        patterns = [p.strip() for p in self.drain_patterns_var.get().split(",") if p.strip()]
+        owner = self.drain_owner_var.get().strip()
+        timeout = parse_seconds(self.drain_timeout_var.get(), self.config["drain_timeout"])
+        
+        if (patterns, owner, timeout) != (self.config["drain_patterns"], self.config["drain_owner"],
+                                          self.config["drain_timeout"]):
+            self.config["drain_patterns"] = patterns
+            self.config["drain_owner"] = owner
+            self.config["drain_timeout"] = timeout
+            self.save_config()
+    
     def choose_text_color(self):
         """Open color chooser for text color with real-time preview"""
+        self.ensure_overlay()
         color = colorchooser.askcolor(title="Choose Text Color", initialcolor=self.config["text_color"])
         if color[1]:
             self.config["text_color"] = color[1]
@@ -504,6 +1553,7 @@ class ShutdownTimerApp:
     
     def choose_bg_color(self):
         """Open color chooser for background color with real-time preview"""
+        self.ensure_overlay()
         color = colorchooser.askcolor(title="Choose Background Color", initialcolor=self.config["bg_color"])
         if color[1]:
             self.config["bg_color"] = color[1]
@@ -512,35 +1562,58 @@ class ShutdownTimerApp:
     
     def adjust_opacity(self):
         """Adjust overlay opacity with real-time preview"""
+        self.ensure_overlay()
+        if self.opacity_window is None:
+            self.create_opacity_window()
+        
+        # Reflect the current setting each time the cached dialog is reopened
+        self.opacity_var.set(self.config["opacity"])
+        self.opacity_value_var.set(f"{int(self.config['opacity'] * 100)}%")
+        self.show_dialog(self.opacity_window)
+    
+    def create_opacity_window(self):
+        """Build the opacity dialog once; it is hidden rather than destroyed on close"""
         opacity_window = tk.Toplevel(self.root)
+        opacity_window.withdraw()
         opacity_window.title("Adjust Opacity")
         opacity_window.geometry("500x500")
         opacity_window.resizable(False, False)
+        opacity_window.protocol("WM_DELETE_WINDOW", opacity_window.withdraw)
         
         ttk.Label(opacity_window, text="Opacity:").pack(pady=10)
         
+        self.opacity_var = tk.DoubleVar(value=self.config["opacity"])
         opacity_slider = ttk.Scale(opacity_window, from_=0.1, to=1.0, orient=tk.HORIZONTAL, 
-                                  value=self.config["opacity"], command=self.update_opacity)
+                                  variable=self.opacity_var, command=self.update_opacity)
         opacity_slider.pack(pady=5, fill=tk.X, padx=20)
         
         # Opacity value display
-        opacity_value_var = tk.StringVar(value=f"{int(self.config['opacity'] * 100)}%")
-        opacity_label = ttk.Label(opacity_window, textvariable=opacity_value_var)
+        self.opacity_value_var = tk.StringVar(value=f"{int(self.config['opacity'] * 100)}%")
+        opacity_label = ttk.Label(opacity_window, textvariable=self.opacity_value_var)
         opacity_label.pack(pady=5)
         
         # Update value display
         def update_value(value):
-            opacity_value_var.set(f"{int(float(value) * 100)}%")
+            self.opacity_value_var.set(f"{int(float(value) * 100)}%")
         
         opacity_slider.bind("<Motion>", lambda e: update_value(opacity_slider.get()))
         opacity_slider.bind("<ButtonRelease-1>", lambda e: update_value(opacity_slider.get()))
         
-        ttk.Button(opacity_window, text="OK", command=opacity_window.destroy).pack(pady=5)
+        ttk.Button(opacity_window, text="OK", command=opacity_window.withdraw).pack(pady=5)
+        
+        self.opacity_window = opacity_window
+    
+    def show_dialog(self, window):
+        """Bring a cached dialog back on screen"""
+        window.deiconify()
+        window.lift()
+        window.focus_set()
     
     def update_opacity(self, value):
         """Update overlay opacity in real-time"""
         self.config["opacity"] = float(value)
         self.overlay.attributes("-alpha", self.config["opacity"])
+        self.sync_overlay()
         self.save_config()
     
     def update_overlay_colors(self):
@@ -554,15 +1627,30 @@ class ShutdownTimerApp:
         style = ttk.Style()
         style.configure("Overlay.TFrame", background=self.config["bg_color"])
         style.configure("Overlay.TLabel", background=self.config["bg_color"])
+        self.sync_overlay()
     
 
     
     def choose_font(self):
         """Open font selection window with real-time preview"""
+        self.ensure_overlay()
+        if self.font_window is None:
+            self.create_font_window()
+        
+        # Start from the current font each time the cached dialog is reopened
+        self.font_family_var.set(self.config["font_family"])
+        self.font_size_var.set(self.config["font_size"])
+        self.font_preview_label.configure(font=(self.config["font_family"], self.config["font_size"], "bold"))
+        self.show_dialog(self.font_window)
+    
+    def create_font_window(self):
+        """Build the font dialog once; it is hidden rather than destroyed on close"""
         font_window = tk.Toplevel(self.root)
+        font_window.withdraw()
         font_window.title("Font Selection")
         font_window.geometry("450x350")
         font_window.resizable(False, False)
+        font_window.protocol("WM_DELETE_WINDOW", lambda: self.reset_font_preview(font_window))
         
         # Font family selection
         ttk.Label(font_window, text="Font Family:").grid(row=0, column=0, padx=10, pady=10, sticky=tk.W)
@@ -593,6 +1681,7 @@ class ShutdownTimerApp:
             self.overlay_label.configure(font=(font_family_var.get(), font_size_var.get(), "bold"))
             if self.dynamic_size_var.get():
                 self.adjust_overlay_size()
+            self.sync_overlay()
         
         font_family_combobox.bind("<<ComboboxSelected>>", lambda e: update_preview())
         font_size_spinbox.bind("<KeyRelease>", lambda e: update_preview())
@@ -609,13 +1698,19 @@ class ShutdownTimerApp:
         
         # Configure grid weights
         font_window.grid_columnconfigure(1, weight=1)
+        
+        self.font_family_var = font_family_var
+        self.font_size_var = font_size_var
+        self.font_preview_label = preview_label
+        self.font_window = font_window
     
     def reset_font_preview(self, window):
         """Reset font settings if user cancels font selection"""
         self.overlay_label.configure(font=(self.config["font_family"], self.config["font_size"], "bold"))
         if self.dynamic_size_var.get():
             self.adjust_overlay_size()
-        window.destroy()
+        self.sync_overlay()
+        window.withdraw()
     
     def apply_font(self, family, size, window):
         """Apply selected font settings to overlay"""
@@ -629,11 +1724,13 @@ class ShutdownTimerApp:
         if self.dynamic_size_var.get():
             self.adjust_overlay_size()
         
+        self.sync_overlay()
         self.save_config()
-        window.destroy()
+        window.withdraw()
     
     def toggle_dynamic_size(self):
         """Toggle dynamic size (auto-fit) behavior"""
+        self.ensure_overlay()
         self.config["auto_size"] = self.dynamic_size_var.get()
         
         if self.dynamic_size_var.get():
@@ -650,6 +1747,7 @@ class ShutdownTimerApp:
             self.overlay.bind("<ButtonPress-3>", self.start_resize)
             self.overlay.bind("<B3-Motion>", self.resize_window)
         
+        self.sync_overlay()
         self.save_config()
     
     def adjust_overlay_size(self):
@@ -672,10 +1770,105 @@ class ShutdownTimerApp:
     
     def toggle_overlay(self):
         """Show or hide the floating overlay"""
-        if self.show_overlay_var.get():
+        self.ensure_overlay()
+        if self.show_overlay_var.get() and not self.config["overlay_out_of_process"]:
             self.overlay.deiconify()
         else:
             self.overlay.withdraw()
+        self.sync_overlay()
+    
+    def show_overlay_if_hidden(self):
+        """Bring back the in-process overlay when a timer starts"""
+        if self.config["overlay_out_of_process"]:
+            self.sync_overlay()
+        elif self.show_overlay_var.get() and self.overlay.winfo_viewable() == 0:
+            self.overlay.deiconify()
+    
+    def toggle_overlay_process(self):
+        """Switch between the in-process overlay and the overlay process"""
+        self.ensure_overlay()
+        self.config["overlay_out_of_process"] = self.overlay_process_var.get()
+        
+        if self.overlay_process_var.get():
+            self.overlay.withdraw()
+            self.start_overlay_process()
+        else:
+            if self.overlay_client is not None:
+                self.receive_overlay_position()
+                self.overlay_client.close()
+                self.overlay_client = None
+            if self.show_overlay_var.get():
+                self.overlay.deiconify()
+        
+        self.save_config()
+    
+    def start_overlay_process(self):
+        """Connect to (or launch) the overlay process and keep it in sync"""
+        if self.overlay_client is None:
+            self.overlay_client = OverlayClient()
+            self.overlay_heartbeat()
+    
+    def overlay_heartbeat(self):
+        """Periodically resync so a restarted overlay process gets the full state"""
+        if self.overlay_client is None:
+            return
+        # Schedule first so an error in one sync can't stop reconnecting for good
+        self.root.after(1000, self.overlay_heartbeat)
+        try:
+            self.sync_overlay()
+        except Exception as e:
+            print(f"Overlay sync error: {e}")
+    
+    def overlay_state(self):
+        """Values the overlay process renders"""
+        state = {
+            "deadline": self.deadline,
+            "font_family": self.config["font_family"],
+            "font_size": self.config["font_size"],
+            "text_color": self.config["text_color"],
+            "bg_color": self.config["bg_color"],
+            "opacity": self.config["opacity"],
+            "auto_size": self.config["auto_size"],
+            "size": list(self.config["overlay_size"]),
+            "position": list(self.config["overlay_position"]),
+            "visible": self.show_overlay_var.get()
+        }
+        # The overlay counts down from the deadline itself, so text only matters without one
+        if self.deadline is None:
+            state["text"] = self.overlay_time_var.get()
+        return state
+    
+    def sync_overlay(self):
+        """Send changed state to the overlay process, if it is in use"""
+        if self.overlay_client is not None:
+            self.overlay_client.update(self.overlay_state())
+            if self.overlay_client.failed:
+                self.overlay_process_failed()
+            elif self.overlay_client.position is not None:
+                self.config["overlay_position"] = self.overlay_client.position
+    
+    def overlay_process_failed(self):
+        """Fall back to the in-process overlay when the overlay process never comes up"""
+        self.overlay_client = None
+        self.overlay_process_var.set(False)
+        self.config["overlay_out_of_process"] = False
+        self.save_config()
+        
+        self.ensure_overlay()
+        if self.show_overlay_var.get():
+            self.overlay.deiconify()
+        messagebox.showwarning("Warning", "The overlay process could not be started. "
+                               "The overlay is shown by this window instead.")
+    
+    def receive_overlay_position(self):
+        """Store the position the overlay process was dragged to"""
+        try:
+            self.overlay_client.receive()
+        except (OSError, EOFError):
+            pass
+        
+        if self.overlay_client.position is not None:
+            self.config["overlay_position"] = self.overlay_client.position
     
     def on_closing(self):
         """Handle application closing"""
@@ -684,27 +1877,311 @@ class ShutdownTimerApp:
                 return
         
         # Save current overlay position and size
-        self.config["overlay_position"] = (self.overlay.winfo_x(), self.overlay.winfo_y())
-        self.config["overlay_size"] = (self.overlay.winfo_width(), self.overlay.winfo_height())
+        if self.overlay_client is not None:
+            self.receive_overlay_position()
+            self.overlay_client.close()
+            self.overlay_client = None
+        elif self.overlay is not None:
+            self.config["overlay_position"] = (self.overlay.winfo_x(), self.overlay.winfo_y())
+            self.config["overlay_size"] = (self.overlay.winfo_width(), self.overlay.winfo_height())
         self.save_timer_settings()
         self.save_config()
         
         # Perform shutdown if timer was running
         self.is_running = False
+        self.is_watching = False
+        self.is_draining = False
+        self.wake_waits()
         
         # Destroy all windows
-        self.overlay.destroy()
+        if self.overlay is not None:
+            self.overlay.destroy()
         self.root.destroy()
 
+class OverlayRenderer:
+    """Standalone overlay window running in its own process.
+
+    State arrives from the main application over a local connection. The countdown
+    is rendered from a deadline, so it keeps ticking while the main window is blocked
+    by modal dialogs. When the main process goes away the overlay hides and waits
+    for it to reconnect, exiting after OVERLAY_ORPHAN_TIMEOUT seconds.
+    """
+    
+    # Consecutive listener errors tolerated before the overlay stops accepting connections
+    LISTEN_RETRIES = 5
+    
+    def __init__(self, root, listener):
+        self.root = root
+        self.listener = listener
+        self.connection = None
+        self.disconnected_at = time.monotonic()
+        import queue
+        self.messages = queue.Queue()
+        self.state = {
+            "text": "00:00:00",
+            "deadline": None,
+            "font_family": DEFAULT_CONFIG["font_family"],
+            "font_size": DEFAULT_CONFIG["font_size"],
+            "text_color": DEFAULT_CONFIG["text_color"],
+            "bg_color": DEFAULT_CONFIG["bg_color"],
+            "opacity": DEFAULT_CONFIG["opacity"],
+            "auto_size": DEFAULT_CONFIG["auto_size"],
+            "size": list(DEFAULT_CONFIG["overlay_size"]),
+            "position": list(DEFAULT_CONFIG["overlay_position"]),
+            "visible": False
+        }
+        
+        self.root.title("Shutdown Timer Overlay")
+        self.root.overrideredirect(True)
+        self.root.attributes("-topmost", True)
+        self.root.withdraw()
+        
+        self.time_var = tk.StringVar(value=self.state["text"])
+        self.label = tk.Label(self.root, textvariable=self.time_var)
+        self.label.pack(fill=tk.BOTH, expand=True)
+        self.apply_style()
+        
+        # Drag functionality; the final position is reported back to the main process
+        self.root.bind("<ButtonPress-1>", self.start_drag)
+        self.root.bind("<B1-Motion>", self.drag_window)
+        self.root.bind("<ButtonRelease-1>", self.end_drag)
+        
+        threading.Thread(target=self.listen, daemon=True).start()
+        self.process_messages()
+        self.tick()
+    
+    def listen(self):
+        """Background thread accepting main-process connections; the newest one wins"""
+        from multiprocessing import AuthenticationError
+        errors = 0
+        while True:
+            try:
+                connection = self.listener.accept()
+            except (EOFError, AuthenticationError):
+                # Failed handshake; keep listening
+                continue
+            except OSError as e:
+                # The listener itself is failing; retry slowly, then give up and let the orphan timeout exit
+                errors += 1
+                if errors >= self.LISTEN_RETRIES:
+                    print(f"Overlay stopped listening: {e}")
+                    return
+                time.sleep(1)
+                continue
+            errors = 0
+            self.connection = connection
+            threading.Thread(target=self.read_messages, args=(connection,), daemon=True).start()
+    
+    def read_messages(self, connection):
+        """Background thread queueing state updates from one connection"""
+        try:
+            while True:
+                self.messages.put(recv_overlay_message(connection, OVERLAY_STATE_CHECKS))
+        except (OSError, EOFError):
+            # Main process went away; wait for it to reconnect
+            pass
+        if self.connection is connection:
+            self.connection = None
+        connection.close()
+    
+    def process_messages(self):
+        """Apply state changes received from the main process"""
+        changed = {}
+        while not self.messages.empty():
+            changed.update(self.messages.get_nowait())
+        
+        if changed.get("quit"):
+            self.root.destroy()
+            return
+        
+        # Don't leave a stale countdown on top of everything without a main window
+        if self.connection is None:
+            if self.disconnected_at is None:
+                self.disconnected_at = time.monotonic()
+                self.root.withdraw()
+            elif time.monotonic() - self.disconnected_at > OVERLAY_ORPHAN_TIMEOUT:
+                self.root.destroy()
+                return
+        else:
+            self.disconnected_at = None
+        
+        self.root.after(50, self.process_messages)
+        
+        if changed:
+            self.state.update(changed)
+            try:
+                if changed.keys() & {"font_family", "font_size", "text_color", "bg_color", "opacity", "auto_size", "size"}:
+                    self.apply_style()
+                if "position" in changed:
+                    self.root.geometry(f"+{self.state['position'][0]}+{self.state['position'][1]}")
+                if "visible" in changed:
+                    if self.state["visible"]:
+                        self.root.deiconify()
+                    else:
+                        self.root.withdraw()
+                self.render()
+            except tk.TclError as e:
+                print(f"Overlay error: {e}")
+    
+    def tick(self):
+        """Advance the countdown locally from the deadline"""
+        self.render()
+        self.root.after(200, self.tick)
+    
+    def render(self):
+        """Update the label only when the displayed text changes"""
+        if self.state["deadline"] is not None:
+            text = format_time(max(0, self.state["deadline"] - time.time()))
+        else:
+            text = self.state["text"]
+        
+        if text != self.time_var.get():
+            self.time_var.set(text)
+            if self.state["auto_size"]:
+                self.fit_to_text()
+    
+    def apply_style(self):
+        """Apply font, colors, opacity and size"""
+        self.label.configure(font=(self.state["font_family"], self.state["font_size"], "bold"),
+                             fg=self.state["text_color"], bg=self.state["bg_color"])
+        self.root.configure(bg=self.state["bg_color"])
+        self.root.attributes("-alpha", self.state["opacity"])
+        if self.state["auto_size"]:
+            self.fit_to_text()
+        else:
+            self.root.geometry(f"{self.state['size'][0]}x{self.state['size'][1]}")
+    
+    def fit_to_text(self):
+        """Size the window to the current text, like the in-process overlay"""
+        font_obj = tkfont.Font(family=self.state["font_family"], size=self.state["font_size"], weight="bold")
+        padding = 5
+        new_width = font_obj.measure(self.time_var.get()) + padding
+        new_height = font_obj.metrics('linespace') + padding
+        self.root.geometry(f"{new_width}x{new_height}+{self.root.winfo_x()}+{self.root.winfo_y()}")
+    
+    def start_drag(self, event):
+        """Start drag operation for overlay"""
+        self.x = event.x
+        self.y = event.y
+    
+    def drag_window(self, event):
+        """Drag window to new position"""
+        x = self.root.winfo_x() + event.x - self.x
+        y = self.root.winfo_y() + event.y - self.y
+        self.root.geometry(f"+{x}+{y}")
+    
+    def end_drag(self, event):
+        """Report the new position to the main process"""
+        position = [self.root.winfo_x(), self.root.winfo_y()]
+        self.state["position"] = position
+        connection = self.connection
+        if connection is not None:
+            try:
+                send_overlay_message(connection, {"position": position})
+            except (OSError, EOFError):
+                pass
+
+def run_overlay_process():
+    """Entry point of the out-of-process overlay"""
+    from multiprocessing import AuthenticationError
+    from multiprocessing.connection import Listener, Client
+    endpoint = read_overlay_endpoint()
+    if endpoint is None:
+        print("No overlay endpoint; the overlay is started by the main window")
+        return
+    address, authkey = endpoint
+    
+    try:
+        if os.name == "nt":
+            listener = PrivatePipeListener(address, authkey)
+        else:
+            if os.path.exists(address):
+                # Leave a live overlay alone, otherwise clear the stale socket
+                try:
+                    Client(address, authkey=authkey).close()
+                    return
+                except (OSError, EOFError, AuthenticationError):
+                    os.unlink(address)
+            listener = Listener(address, authkey=authkey)
+    except OSError as e:
+        print(f"Overlay already running or address unavailable: {e}")
+        return
+    
+    root = tk.Tk()
+    OverlayRenderer(root, listener)
+    try:
+        root.mainloop()
+    finally:
+        listener.close()
+
+def get_rss_mb():
+    """Return the resident set size of this process in MB"""
+    if os.name == "nt":
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [("cb", ctypes.c_ulong), ("PageFaultCount", ctypes.c_ulong),
+                        ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                        ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                        ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        handle = ctypes.windll.kernel32.GetCurrentProcess()
+        ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb)
+        return counters.WorkingSetSize / (1024 * 1024)
+    
+    try:
+        with open("/proc/self/status", 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+def report_startup_profile(root, app):
+    """Print time-to-first-frame, time-to-ready and RSS, then exit non-zero if over budget"""
+    if app.ready_time is None:
+        # Deferred startup has not finished yet
+        root.after(10, report_startup_profile, root, app)
+        return
+    
+    if app.first_frame_time is None:
+        print("Main window was never exposed")
+        root.destroy()
+        sys.exit(1)
+    
+    first_frame_ms = (app.first_frame_time - STARTUP_TIME) * 1000
+    ready_ms = (app.ready_time - STARTUP_TIME) * 1000
+    rss_mb = get_rss_mb()
+    
+    print(f"first_frame_ms: {first_frame_ms:.1f} (budget {FIRST_FRAME_BUDGET_MS})")
+    print(f"ready_ms: {ready_ms:.1f}")
+    print(f"rss_mb: {rss_mb:.1f} (budget {RSS_BUDGET_MB})")
+    
+    over_budget = first_frame_ms > FIRST_FRAME_BUDGET_MS or rss_mb > RSS_BUDGET_MB
+    if over_budget:
+        print("Startup profile is over budget")
+    
+    root.destroy()
+    sys.exit(1 if over_budget else 0)
+
 def main():
     """Main entry point"""
+    if "--overlay" in sys.argv:
+        run_overlay_process()
+        return
+    
     root = tk.Tk()
     app = ShutdownTimerApp(root)
     
+    # Measure cold start: python app/main.py --profile-startup
+    if "--profile-startup" in sys.argv:
+        root.after_idle(report_startup_profile, root, app)
+    
     # Add keyboard shortcuts
     root.bind("<Control-Key-s>", lambda e: app.start_timer())
     root.bind("<Control-Key-p>", lambda e: app.pause_timer() if app.is_running else None)
-    root.bind("<Control-Key-c>", lambda e: app.cancel_timer() if app.is_running else None)
+    root.bind("<Control-Key-c>", lambda e: app.cancel_timer() if app.is_running or app.is_draining else None)
     root.bind("<Escape>", lambda e: app.on_closing())
     
     # Make application look like native Windows app